@@ -4,52 +4,595 @@ Incluye clases para gestionar Hoteles, Clientes (Customers) y Reservaciones
 con almacenamiento persistente usando archivos JSON.
 """
 
+import atexit
+import contextlib
+import dataclasses
 import json
+import logging
+import math
+import mmap
 import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, Optional, Union
 
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:  # pragma: no cover
+    HAVE_ORJSON = False
 
-def load_data(filename):
+log = logging.getLogger(__name__)
+
+# Tipos del almacenamiento: un archivo es un objeto JSON {id: registro}
+Data = dict[str, Any]
+Patch = dict[str, Any]
+Stat = Optional[tuple[int, int]]
+Signature = tuple[Stat, Stat]
+EntityId = Union[int, str]
+
+# Centinela para dict.pop: distingue una llave ausente de un valor null
+_MISSING: Any = object()
+
+# Caché del estado en disco: nombre de archivo -> (firma, datos, parches),
+# donde la firma es el (mtime_ns, tamaño) de la instantánea y del log y
+# parches es el número de operaciones en el log
+_CACHE: dict[str, tuple[Signature, Data, int]] = {}
+
+# Escrituras pendientes: nombre de archivo -> datos por guardar
+_DIRTY: dict[str, Data] = {}
+_LOCK = threading.RLock()
+_TIMER: Optional[threading.Timer] = None
+# Errores de escrituras en segundo plano, por archivo, pendientes de reportar
+_ERRORS: dict[str, Exception] = {}
+
+# Segundos que se agrupan las escrituras de un archivo antes de guardarlo
+FLUSH_DELAY = 0.01
+
+# Con RS_PRETTY definida los archivos se escriben indentados
+HUMAN_READABLE = bool(os.getenv("RS_PRETTY"))
+
+# Cada archivo JSON (instantánea) tiene al lado un log JSONL de operaciones
+# JSON Patch (RFC 6902); se compacta cuando el log supera COMPACT_RATIO veces
+# el tamaño de la instantánea o acumula COMPACT_PATCHES operaciones.
+LOG_SUFFIX = ".log"
+COMPACT_RATIO = 4
+COMPACT_PATCHES = 1000
+
+
+def _loads(raw: Union[bytes, memoryview]) -> Any:
     """
-    Carga los datos desde un archivo JSON.
-    Devuelve un diccionario vacío si el archivo no existe
-    o tiene datos inválidos.
+    Parsea bytes o un memoryview JSON con orjson si está disponible. Si
+    orjson lo rechaza se reintenta con json, que además admite NaN e
+    Infinity como los escribe _dumps.
     """
-    if not os.path.exists(filename):
+    if HAVE_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(bytes(raw))
+
+
+def _finite(value: Any) -> bool:
+    """Indica si `value` no contiene flotantes NaN o infinitos."""
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_finite(item) for item in value)
+    return True
+
+
+def _dumps(data: Any, pretty: bool = False) -> bytes:
+    """
+    Serializa a bytes JSON, compacto salvo con pretty. Usa orjson cuando el
+    resultado es el mismo que daría json: las llaves no str se convierten a
+    str como en json, y los enteros de más de 64 bits o los NaN/Infinity
+    (que orjson rechaza o escribe como null) se serializan con json.
+    """
+    if HAVE_ORJSON and _finite(data):
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    if pretty:
+        return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+    return json.dumps(
+        data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _copy(data: Data) -> Data:
+    """
+    Devuelve una copia de dos niveles del diccionario {id: {campo: valor}}.
+    Es suficiente para la estructura de los archivos y evita que los
+    llamadores modifiquen la copia guardada en caché. Los valores que no
+    son objetos se conservan tal cual.
+    """
+    return {key: dict(value) if isinstance(value, dict) else value
+            for key, value in data.items()}
+
+
+def _stat(path: str) -> Stat:
+    """Devuelve (mtime_ns, tamaño) del archivo, o None si no existe."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _signature(filename: str) -> Signature:
+    """Devuelve (mtime_ns, tamaño) de la instantánea y del log, o None."""
+    return _stat(filename), _stat(filename + LOG_SUFFIX)
+
+
+@contextlib.contextmanager
+def _mapped(path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Mapea el archivo en memoria de sólo lectura para parsearlo sin copiarlo
+    a un objeto bytes. Un archivo vacío (que mmap no admite) da b"".
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def _pointer(*keys: str) -> str:
+    """Construye un JSON Pointer (RFC 6901) a partir de las llaves."""
+    return "".join(
+        "/" + key.replace("~", "~0").replace("/", "~1") for key in keys)
+
+
+def _apply(data: Data, patch: Patch) -> None:
+    """Aplica una operación add/replace/remove de JSON Patch a `data`."""
+    keys = [part.replace("~1", "/").replace("~0", "~")
+            for part in patch["path"].split("/")[1:]]
+    target = data
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    if patch["op"] == "remove":
+        target.pop(keys[-1], None)
+    else:
+        target[keys[-1]] = patch["value"]
+
+
+def _diff(old: Data, new: Data) -> list[Patch]:
+    """
+    Devuelve las operaciones JSON Patch que llevan de `old` a `new`, a
+    nivel de campo para los registros modificados.
+    """
+    ops: list[Patch] = [{"op": "remove", "path": _pointer(key)}
+                        for key in old if key not in new]
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": _pointer(key), "value": value})
+            continue
+        before = old[key]
+        if before == value:
+            continue
+        if not isinstance(before, dict) or not isinstance(value, dict):
+            ops.append(
+                {"op": "replace", "path": _pointer(key), "value": value})
+            continue
+        ops.extend({"op": "remove", "path": _pointer(key, field)}
+                   for field in before if field not in value)
+        ops.extend({"op": "replace" if field in before else "add",
+                    "path": _pointer(key, field), "value": item}
+                   for field, item in value.items()
+                   if field not in before or before[field] != item)
+    return ops
+
+
+# Espacios en blanco permitidos por JSON (RFC 8259) alrededor del valor
+JSON_WHITESPACE = b" \t\r\n"
+
+
+def _is_object(buf: Union[bytes, mmap.mmap]) -> bool:
+    """
+    Revisión rápida de que el contenido, sin los espacios en blanco de los
+    extremos, empieza con '{' y termina con '}', para descartar archivos
+    vacíos o truncados sin invocar al parser.
+    """
+    start, end = 0, len(buf)
+    while start < end and buf[start] in JSON_WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1] in JSON_WHITESPACE:
+        end -= 1
+    return (end - start >= 2 and buf[start] == ord("{")
+            and buf[end - 1] == ord("}"))
+
+
+def _read(filename: str) -> Optional[tuple[Data, int]]:
+    """
+    Materializa el estado leyendo la instantánea y aplicando el log.
+    Una última línea sin salto de línea (escritura interrumpida) se ignora.
+    Devuelve los datos y el número de operaciones aplicadas, o None si la
+    instantánea no es un objeto JSON.
+    """
+    data: Data = {}
+    patches = 0
+    if os.path.exists(filename):
+        with _mapped(filename) as buf, memoryview(buf) as view:
+            if not _is_object(buf):
+                return None
+            data = _loads(view)
+    if os.path.exists(filename + LOG_SUFFIX):
+        # Las líneas se copian a bytes: un memoryview del mmap que quede
+        # vivo en el traceback de un error impediría cerrar el mapeo.
+        with _mapped(filename + LOG_SUFFIX) as buf:
+            start = 0
+            end = buf.find(b"\n")
+            while end != -1:
+                _apply(data, _loads(buf[start:end]))
+                patches += 1
+                start = end + 1
+                end = buf.find(b"\n", start)
+    return data, patches
+
+
+def _disk_state(filename: str) -> Optional[Data]:
+    """
+    Devuelve el estado en disco, sin copiar, usando la caché mientras la
+    firma de los archivos no cambie. Devuelve None si los datos son
+    inválidos.
+    """
+    signature = _signature(filename)
+    if signature == (None, None):
+        _CACHE.pop(filename, None)
         return {}
+    entry = _CACHE.get(filename)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except json.JSONDecodeError:
-        print(f"Error: Datos JSON inválidos en {filename}. Retornando vacío.")
+        result = _read(filename)
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError,
+            AttributeError):
+        return None
+    if result is None:
+        return None
+    _CACHE[filename] = (signature, *result)
+    return result[0]
+
+
+def _prefetch(*filenames: str) -> None:
+    """
+    Lee en paralelo los archivos que no tienen escritura pendiente ni
+    entrada en caché, para que las cargas siguientes sean aciertos. No
+    revisa la firma de los que ya están en caché: con la caché caliente
+    no hace llamadas al sistema y la carga normal detecta los cambios.
+    """
+    cold = [filename for filename in filenames
+            if filename not in _DIRTY and filename not in _CACHE]
+    if len(cold) > 1:
+        with ThreadPoolExecutor(max_workers=len(cold)) as executor:
+            list(executor.map(_disk_state, cold))
+
+
+def _current(filename: str) -> Optional[Data]:
+    """
+    Devuelve, sin copiar, los datos pendientes de escribir o, si no hay,
+    el estado en disco. Registra un error y devuelve None si son inválidos.
+    """
+    with _LOCK:
+        pending = _DIRTY.get(filename)
+        if pending is not None:
+            return pending
+    data = _disk_state(filename)
+    if data is None:
+        log.error("Datos JSON inválidos en %s. Retornando vacío.", filename)
+    return data
+
+
+def load_data(filename: str) -> Data:
+    """
+    Carga los datos desde un archivo JSON y su log de operaciones.
+    Devuelve un diccionario vacío si el archivo no existe
+    o tiene datos inválidos. Si hay una escritura pendiente se devuelven
+    esos datos; si los archivos no han cambiado desde la última lectura o
+    escritura (mismo mtime y tamaño) se usa la copia en caché.
+    """
+    data = _current(filename)
+    if data is None:
         return {}
+    return _copy(data)
+
+
+def load_key(filename: str, key: str) -> Any:
+    """
+    Devuelve una copia del registro `key` o None si no existe, sin copiar
+    el resto del archivo. Útil para consultas puntuales.
+    """
+    data = _current(filename)
+    record = data.get(key) if data is not None else None
+    if isinstance(record, dict):
+        return dict(record)
+    return record
+
+
+def key_exists(filename: str, key: str) -> bool:
+    """
+    Indica si existe el registro `key`, sin copiar datos. El estado
+    pendiente o en caché funciona como índice de IDs, así que la consulta
+    sólo lee el archivo si cambió en disco.
+    """
+    data = _current(filename)
+    return data is not None and key in data
+
+
+def _write_snapshot(filename: str, data: Data) -> None:
+    """
+    Escribe la instantánea de forma atómica: una sola escritura a un
+    archivo temporal, fsync y os.replace, de modo que un fallo nunca deja
+    un JSON a medias. Después elimina el log y actualiza la caché.
+    """
+    tmp = filename + ".tmp"
+    try:
+        with open(tmp, 'wb') as file:
+            file.write(_dumps(data, HUMAN_READABLE))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, filename)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if os.path.exists(filename + LOG_SUFFIX):
+        os.remove(filename + LOG_SUFFIX)
+    _CACHE[filename] = (_signature(filename), data, 0)
+
+
+def _trim_torn_tail(fd: int) -> None:
+    """
+    Recorta el log hasta su último salto de línea si termina con una línea
+    incompleta (escritura interrumpida), para no pegarle el siguiente
+    parche.
+    """
+    size = os.fstat(fd).st_size
+    if size == 0:
+        return
+    os.lseek(fd, size - 1, os.SEEK_SET)
+    if os.read(fd, 1) == b"\n":
+        return
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as buf:
+        end = buf.rfind(b"\n") + 1
+    os.ftruncate(fd, end)
+
+
+def _write_file(filename: str, data: Data) -> None:
+    """
+    Añade al log los parches que llevan del estado en disco a `data` con
+    una sola escritura O_APPEND, tras descartar una línea final incompleta,
+    y compacta si el log creció demasiado.
+    """
+    disk = _disk_state(filename)
+    if disk is None or not os.path.exists(filename):
+        _write_snapshot(filename, data)
+        return
+    ops = _diff(disk, data)
+    patches = _CACHE[filename][2] + len(ops)
+    if ops:
+        payload = b"".join(_dumps(op) + b"\n" for op in ops)
+        fd = os.open(filename + LOG_SUFFIX,
+                     os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            _trim_torn_tail(fd)
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+    signature = _signature(filename)
+    snapshot_size = signature[0][1] if signature[0] else 0
+    log_size = signature[1][1] if signature[1] else 0
+    if (patches >= COMPACT_PATCHES
+            or log_size > COMPACT_RATIO * snapshot_size):
+        _write_snapshot(filename, data)
+    else:
+        _CACHE[filename] = (signature, data, patches)
+
+
+def compact(filename: str) -> None:
+    """
+    Reescribe la instantánea con el estado actual y elimina el log.
+    """
+    flush()
+    with _LOCK:
+        data = _disk_state(filename)
+        if data is not None and _signature(filename) != (None, None):
+            _write_snapshot(filename, data)
 
 
-def save_data(filename, data):
+def _flush_each() -> dict[str, Exception]:
+    """
+    Intenta escribir cada guardado pendiente, en el orden en que se
+    hicieron, aunque alguno falle. Un guardado sólo deja de estar pendiente
+    cuando su escritura termina. Devuelve los errores por archivo.
+    """
+    global _TIMER  # pylint: disable=global-statement
+    errors = {}
+    with _LOCK:
+        if _TIMER is not None:
+            _TIMER.cancel()
+            _TIMER = None
+        for filename in list(_DIRTY):
+            try:
+                _write_file(filename, _DIRTY[filename])
+            except Exception as error:  # pylint: disable=broad-except
+                errors[filename] = error
+            else:
+                del _DIRTY[filename]
+            _ERRORS.pop(filename, None)
+    return errors
+
+
+def flush() -> None:
+    """
+    Escribe en disco todos los guardados pendientes. Si la escritura de
+    algún archivo falla, los demás se escriben igual, el fallido sigue
+    pendiente y se lanza el primer error.
+    """
+    errors = _flush_each()
+    if errors:
+        raise next(iter(errors.values()))
+
+
+def _background_flush() -> None:
+    """
+    flush() del temporizador: registra y guarda los errores para lanzarlos
+    en el siguiente save_data del mismo archivo, en lugar de perderlos en el
+    hilo.
+    """
+    errors = _flush_each()
+    for filename, error in errors.items():
+        log.error("No se pudo guardar %s: %s", filename, error)
+    with _LOCK:
+        _ERRORS.update(errors)
+
+
+def save_data(filename: str, data: Data) -> None:
     """
     Guarda un diccionario en un archivo JSON.
+    Los datos se serializan aquí, así que un valor no serializable lanza
+    el error al llamador. La escritura a disco se difiere FLUSH_DELAY
+    segundos para agrupar varios guardados del mismo archivo en uno solo;
+    flush() la fuerza. Si la escritura en segundo plano de este archivo
+    falló, los datos nuevos quedan pendientes y se lanza ese error.
+    """
+    global _TIMER  # pylint: disable=global-statement
+    # Lo pendiente es exactamente lo que se escribirá (p. ej. llaves int
+    # convertidas a str), igual que al volver a leer el archivo.
+    pending = _loads(_dumps(data))
+    with _LOCK:
+        _DIRTY[filename] = pending
+        error = _ERRORS.pop(filename, None)
+        if _TIMER is None:
+            _TIMER = threading.Timer(FLUSH_DELAY, _background_flush)
+            _TIMER.daemon = True
+            _TIMER.start()
+    if error is not None:
+        raise error
+
+
+@contextlib.contextmanager
+def transaction() -> Iterator[None]:
+    """
+    Exclusión mutua para lecturas y guardados de varios archivos: mientras
+    dure, ningún otro hilo del proceso puede modificar los datos ni hacer
+    flush. Si el bloque lanza una excepción se descartan los guardados
+    hechos dentro de él.
+
+    No es un commit atómico en disco: flush() escribe los archivos uno tras
+    otro, así que una caída a mitad de un flush puede dejar sólo una parte
+    de los cambios escrita.
+    """
+    with _LOCK:
+        pending = dict(_DIRTY)
+        try:
+            yield
+        except BaseException:
+            _DIRTY.clear()
+            _DIRTY.update(pending)
+            raise
+
+
+atexit.register(flush)
+
+# Tablas ya construidas: nombre de archivo -> (datos de origen, HotelTable)
+_TABLES: dict[str, tuple[Data, "HotelTable"]] = {}
+
+
+def _rooms(record: Data) -> int:
+    """Devuelve las habitaciones del registro como entero, o 0."""
+    rooms = record.get("rooms", 0)
+    if isinstance(rooms, bool):
+        return 0
+    try:
+        return int(rooms)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclasses.dataclass
+class HotelTable:
+    """
+    Vista de los hoteles como arreglos paralelos (struct-of-arrays), con
+    las habitaciones en un arreglo contiguo de enteros para recorridos
+    agregados rápidos.
     """
-    with open(filename, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=4)
+    ids: list[str]
+    names: list[Optional[str]]
+    locations: list[Optional[str]]
+    rooms: "array[int]"
+    id2idx: dict[str, int]
+
+    @classmethod
+    def from_data(cls, data: Data) -> "HotelTable":
+        """
+        Construye la tabla a partir del diccionario {id: hotel}. Omite los
+        registros que no son objetos; a los campos que faltan les asigna
+        None, y cero habitaciones si "rooms" no es un entero.
+        """
+        records = [(key, record) for key, record in data.items()
+                   if isinstance(record, dict)]
+        return cls(
+            ids=[key for key, _ in records],
+            names=[record.get("name") for _, record in records],
+            locations=[record.get("location") for _, record in records],
+            rooms=array('q', (_rooms(record) for _, record in records)),
+            id2idx={key: index for index, (key, _) in enumerate(records)})
+
+    def total_rooms(self) -> int:
+        """Devuelve el total de habitaciones disponibles."""
+        return sum(self.rooms)
+
+    def sold_out(self) -> list[str]:
+        """Devuelve los IDs de los hoteles sin habitaciones disponibles."""
+        return [key for key, rooms in zip(self.ids, self.rooms) if rooms <= 0]
 
 
 class Hotel:
     """Clase que representa la entidad Hotel y sus operaciones."""
     FILE_NAME = "hotels.json"
+    __slots__ = ("hotel_id", "name", "location", "rooms")
 
-    def __init__(self, hotel_id, name, location, rooms):
+    def __init__(self, hotel_id: EntityId, name: str, location: str,
+                 rooms: int) -> None:
         self.hotel_id = str(hotel_id)
         self.name = name
         self.location = location
         self.rooms = int(rooms)
 
     @classmethod
-    def create_hotel(cls, hotel_id, name, location, rooms):
+    def table(cls) -> HotelTable:
+        """
+        Devuelve los hoteles guardados como una HotelTable de sólo lectura.
+        Se construye sin copiar los datos y se reutiliza mientras el estado
+        pendiente o en caché del archivo sea el mismo objeto.
+        """
+        data = _current(cls.FILE_NAME) or {}
+        entry = _TABLES.get(cls.FILE_NAME)
+        if entry is None or entry[0] is not data:
+            entry = (data, HotelTable.from_data(data))
+            _TABLES[cls.FILE_NAME] = entry
+        return entry[1]
+
+    @classmethod
+    def create_hotel(cls, hotel_id: EntityId, name: str, location: str,
+                     rooms: int) -> bool:
         """Crea un nuevo hotel y lo guarda en el archivo."""
-        data = load_data(cls.FILE_NAME)
-        if str(hotel_id) in data:
-            print(f"Error: El ID del hotel {hotel_id} ya existe.")
+        key = str(hotel_id)
+        if key_exists(cls.FILE_NAME, key):
+            log.error("El ID del hotel %s ya existe.", hotel_id)
             return False
-        data[str(hotel_id)] = {
+        data = load_data(cls.FILE_NAME)
+        data[key] = {
             "name": name,
             "location": location,
             "rooms": rooms
@@ -58,66 +601,90 @@ class Hotel:
         return True
 
     @classmethod
-    def delete_hotel(cls, hotel_id):
+    def delete_hotel(cls, hotel_id: EntityId) -> bool:
         """Elimina un hotel por su ID."""
         data = load_data(cls.FILE_NAME)
-        if str(hotel_id) in data:
-            del data[str(hotel_id)]
+        if data.pop(str(hotel_id), _MISSING) is not _MISSING:
             save_data(cls.FILE_NAME, data)
             return True
-        print(f"Error: Hotel con ID {hotel_id} no encontrado.")
+        log.error("Hotel con ID %s no encontrado.", hotel_id)
         return False
 
     @classmethod
-    def display_hotel(cls, hotel_id):
+    def display_hotel(cls, hotel_id: EntityId) -> Any:
         """Muestra y devuelve la información del hotel."""
-        data = load_data(cls.FILE_NAME)
-        hotel = data.get(str(hotel_id))
-        if hotel:
-            print(f"Hotel {hotel_id}: {hotel}")
+        hotel = load_key(cls.FILE_NAME, str(hotel_id))
+        if hotel is not None:
+            log.info("Hotel %s: %s", hotel_id, hotel)
             return hotel
-        print(f"Error: Hotel con ID {hotel_id} no encontrado.")
+        log.error("Hotel con ID %s no encontrado.", hotel_id)
         return None
 
     @classmethod
-    def modify_hotel(cls, hotel_id, name=None, location=None, rooms=None):
+    def modify_hotel(cls, hotel_id: EntityId, name: Optional[str] = None,
+                     location: Optional[str] = None,
+                     rooms: Optional[int] = None) -> bool:
         """Modifica los atributos de un hotel existente."""
         data = load_data(cls.FILE_NAME)
-        if str(hotel_id) in data:
-            if name is not None:
-                data[str(hotel_id)]["name"] = name
-            if location is not None:
-                data[str(hotel_id)]["location"] = location
-            if rooms is not None:
-                data[str(hotel_id)]["rooms"] = rooms
-            save_data(cls.FILE_NAME, data)
-            return True
-        print(f"Error: Hotel con ID {hotel_id} no encontrado.")
+        entry = data.get(str(hotel_id))
+        if entry is None:
+            log.error("Hotel con ID %s no encontrado.", hotel_id)
+            return False
+        if name is not None:
+            entry["name"] = name
+        if location is not None:
+            entry["location"] = location
+        if rooms is not None:
+            entry["rooms"] = rooms
+        save_data(cls.FILE_NAME, data)
+        return True
+
+    @staticmethod
+    def _reserve_room_in(data: Data, hotel_id: EntityId) -> bool:
+        """Disminuye en uno las habitaciones del hotel en `data`, sin E/S."""
+        entry = data.get(str(hotel_id))
+        if entry is not None:
+            if entry["rooms"] > 0:
+                entry["rooms"] -= 1
+                return True
+            log.error("No hay habitaciones disponibles en %s.", hotel_id)
+            return False
+        log.error("Hotel con ID %s no encontrado.", hotel_id)
         return False
 
     @classmethod
-    def reserve_room(cls, hotel_id):
+    def reserve_room(cls, hotel_id: EntityId) -> bool:
         """Disminuye las habitaciones disponibles de un hotel en uno."""
         data = load_data(cls.FILE_NAME)
-        if str(hotel_id) in data:
-            if data[str(hotel_id)]["rooms"] > 0:
-                data[str(hotel_id)]["rooms"] -= 1
-                save_data(cls.FILE_NAME, data)
-                return True
-            print(f"Error: No hay habitaciones disponibles en {hotel_id}.")
-            return False
-        print(f"Error: Hotel con ID {hotel_id} no encontrado.")
+        if cls._reserve_room_in(data, hotel_id):
+            save_data(cls.FILE_NAME, data)
+            return True
         return False
 
     @classmethod
-    def cancel_room(cls, hotel_id):
+    def reserve_rooms(cls, hotel_ids: Iterable[EntityId]) -> list[bool]:
+        """
+        Reserva una habitación por cada ID de `hotel_ids` con una sola
+        carga y un solo guardado. Devuelve una lista con el resultado de
+        cada reservación.
+        """
+        data = load_data(cls.FILE_NAME)
+        results = [cls._reserve_room_in(data, hotel_id)
+                   for hotel_id in hotel_ids]
+        if any(results):
+            save_data(cls.FILE_NAME, data)
+        return results
+
+    @classmethod
+    def cancel_room(cls, hotel_id: EntityId) -> bool:
         """Aumenta las habitaciones disponibles de un hotel en uno."""
         data = load_data(cls.FILE_NAME)
-        if str(hotel_id) in data:
-            data[str(hotel_id)]["rooms"] += 1
+        entry = data.get(str(hotel_id))
+        if entry is not None:
+            entry["rooms"] += 1
             save_data(cls.FILE_NAME, data)
             return True
-        print(f"Error: Hotel con ID {hotel_id} no encontrado.")
+        log.error("Hotel con ID %s no encontrado.", hotel_id)
         return False
 
 
@@ -126,51 +693,54 @@ class Customer:
     FILE_NAME = "customers.json"
 
     @classmethod
-    def create_customer(cls, customer_id, name, email):
+    def create_customer(cls, customer_id: EntityId, name: str,
+                        email: str) -> bool:
         """Crea un nuevo cliente y lo guarda en el archivo."""
-        data = load_data(cls.FILE_NAME)
-        if str(customer_id) in data:
-            print(f"Error: El ID del cliente {customer_id} ya existe.")
+        key = str(customer_id)
+        if key_exists(cls.FILE_NAME, key):
+            log.error("El ID del cliente %s ya existe.", customer_id)
             return False
-        data[str(customer_id)] = {"name": name, "email": email}
+        data = load_data(cls.FILE_NAME)
+        data[key] = {"name": name, "email": email}
         save_data(cls.FILE_NAME, data)
         return True
 
     @classmethod
-    def delete_customer(cls, customer_id):
+    def delete_customer(cls, customer_id: EntityId) -> bool:
         """Elimina un cliente por su ID."""
         data = load_data(cls.FILE_NAME)
-        if str(customer_id) in data:
-            del data[str(customer_id)]
+        if data.pop(str(customer_id), _MISSING) is not _MISSING:
             save_data(cls.FILE_NAME, data)
             return True
-        print(f"Error: Cliente con ID {customer_id} no encontrado.")
+        log.error("Cliente con ID %s no encontrado.", customer_id)
         return False
 
     @classmethod
-    def display_customer(cls, customer_id):
+    def display_customer(cls, customer_id: EntityId) -> Any:
         """Muestra y devuelve la información del cliente."""
-        data = load_data(cls.FILE_NAME)
-        customer = data.get(str(customer_id))
-        if customer:
-            print(f"Cliente {customer_id}: {customer}")
+        customer = load_key(cls.FILE_NAME, str(customer_id))
+        if customer is not None:
+            log.info("Cliente %s: %s", customer_id, customer)
             return customer
-        print(f"Error: Cliente con ID {customer_id} no encontrado.")
+        log.error("Cliente con ID %s no encontrado.", customer_id)
         return None
 
     @classmethod
-    def modify_customer(cls, customer_id, name=None, email=None):
+    def modify_customer(cls, customer_id: EntityId,
+                        name: Optional[str] = None,
+                        email: Optional[str] = None) -> bool:
         """Modifica los atributos de un cliente existente."""
         data = load_data(cls.FILE_NAME)
-        if str(customer_id) in data:
-            if name is not None:
-                data[str(customer_id)]["name"] = name
-            if email is not None:
-                data[str(customer_id)]["email"] = email
-            save_data(cls.FILE_NAME, data)
-            return True
-        print(f"Error: Cliente con ID {customer_id} no encontrado.")
-        return False
+        entry = data.get(str(customer_id))
+        if entry is None:
+            log.error("Cliente con ID %s no encontrado.", customer_id)
+            return False
+        if name is not None:
+            entry["name"] = name
+        if email is not None:
+            entry["email"] = email
+        save_data(cls.FILE_NAME, data)
+        return True
 
 
 class Reservation:
@@ -178,41 +748,48 @@ class Reservation:
     FILE_NAME = "reservations.json"
 
     @classmethod
-    def create_reservation(cls, reservation_id, customer_id, hotel_id):
+    def create_reservation(cls, reservation_id: EntityId,
+                           customer_id: EntityId, hotel_id: EntityId) -> bool:
         """Crea una reservación si el cliente existe y hay cuartos libres."""
-        customer_data = load_data(Customer.FILE_NAME)
-        hotel_data = load_data(Hotel.FILE_NAME)
-        res_data = load_data(cls.FILE_NAME)
+        res_key = str(reservation_id)
+        customer_key = str(customer_id)
+        hotel_key = str(hotel_id)
+        with transaction():
+            _prefetch(Customer.FILE_NAME, Hotel.FILE_NAME, cls.FILE_NAME)
+            hotel_data = load_data(Hotel.FILE_NAME)
+            res_data = load_data(cls.FILE_NAME)
 
-        if str(reservation_id) in res_data:
-            print(f"Error: La reservación {reservation_id} ya existe.")
-            return False
-        if str(customer_id) not in customer_data:
-            print(f"Error: El cliente {customer_id} no existe.")
-            return False
-        if str(hotel_id) not in hotel_data:
-            print(f"Error: El hotel {hotel_id} no existe.")
-            return False
+            if res_key in res_data:
+                log.error("La reservación %s ya existe.", reservation_id)
+                return False
+            if not key_exists(Customer.FILE_NAME, customer_key):
+                log.error("El cliente %s no existe.", customer_id)
+                return False
+            if hotel_key not in hotel_data:
+                log.error("El hotel %s no existe.", hotel_id)
+                return False
 
-        # Intenta reservar la habitación en el hotel
-        if Hotel.reserve_room(hotel_id):
-            res_data[str(reservation_id)] = {
-                "customer_id": str(customer_id),
-                "hotel_id": str(hotel_id)
-            }
-            save_data(cls.FILE_NAME, res_data)
-            return True
-        return False
+            # Reserva la habitación sobre los datos ya cargados del hotel
+            # pylint: disable-next=protected-access
+            if Hotel._reserve_room_in(hotel_data, hotel_key):
+                res_data[res_key] = {
+                    "customer_id": customer_key,
+                    "hotel_id": hotel_key
+                }
+                save_data(Hotel.FILE_NAME, hotel_data)
+                save_data(cls.FILE_NAME, res_data)
+                return True
+            return False
 
     @classmethod
-    def cancel_reservation(cls, reservation_id):
+    def cancel_reservation(cls, reservation_id: EntityId) -> bool:
         """Cancela una reservación existente y libera la habitación."""
-        res_data = load_data(cls.FILE_NAME)
-        if str(reservation_id) in res_data:
-            hotel_id = res_data[str(reservation_id)]["hotel_id"]
-            Hotel.cancel_room(hotel_id)
-            del res_data[str(reservation_id)]
-            save_data(cls.FILE_NAME, res_data)
-            return True
-        print(f"Error: Reservación {reservation_id} no encontrada.")
+        with transaction():
+            res_data = load_data(cls.FILE_NAME)
+            entry = res_data.pop(str(reservation_id), _MISSING)
+            if entry is not _MISSING:
+                Hotel.cancel_room(entry["hotel_id"])
+                save_data(cls.FILE_NAME, res_data)
+                return True
+        log.error("Reservación %s no encontrada.", reservation_id)
         return False
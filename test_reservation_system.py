@@ -3,29 +3,52 @@ Pruebas unitarias para el Sistema de Reservaciones de Hotel.
 Asegura una cobertura >85% y valida múltiples casos negativos.
 """
 
+import json
+import math
+import tempfile
+import threading
 import unittest
 import os
-from reservation_system import Hotel, Customer, Reservation, load_data
+from unittest import mock
+
+import reservation_system
+from reservation_system import (
+    LOG_SUFFIX, Hotel, Customer, Reservation, compact, flush, key_exists,
+    load_data, load_key, save_data, transaction, _background_flush, _dumps,
+    _loads)
 
 
 class BaseTestCase(unittest.TestCase):
     """Clase base con configuración común para las pruebas."""
 
-    def setUp(self):
-        """Configura el entorno de prueba limpiando los archivos de datos."""
-        self.clean_up_files()
-
-    def tearDown(self):
-        """Limpia los archivos de datos después de cada prueba."""
-        self.clean_up_files()
+    ENTITIES = (Hotel, Customer, Reservation)
 
-    def clean_up_files(self):
-        """Función auxiliar para eliminar archivos JSON
-        y asegurar estado limpio."""
-        for filename in [
-                Hotel.FILE_NAME, Customer.FILE_NAME, Reservation.FILE_NAME]:
-            if os.path.exists(filename):
-                os.remove(filename)
+    def setUp(self):
+        """Apunta los archivos de datos a un directorio temporal, en memoria
+        (/dev/shm) cuando está disponible, para aislar cada prueba. La
+        restauración se registra con addCleanup para que ocurra aunque el
+        flush final falle."""
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        # pylint: disable-next=consider-using-with
+        self.data_dir = tempfile.TemporaryDirectory(dir=shm)
+        self.addCleanup(self.data_dir.cleanup)
+        for entity in self.ENTITIES:
+            self.addCleanup(setattr, entity, "FILE_NAME", entity.FILE_NAME)
+            entity.FILE_NAME = os.path.join(
+                self.data_dir.name, entity.FILE_NAME)
+        self.addCleanup(self.discard_pending)
+        self.addCleanup(flush)
+
+    def discard_pending(self):
+        """Descarta los guardados pendientes que quedaron en el directorio
+        temporal (p. ej. tras un flush fallido) para no afectar a otras
+        pruebas."""
+        prefix = self.data_dir.name + os.sep
+        # pylint: disable-next=protected-access
+        pending = reservation_system._DIRTY
+        for filename in [name for name in pending
+                         if name.startswith(prefix)]:
+            del pending[filename]
 
 
 class TestHotel(BaseTestCase):
@@ -50,13 +73,16 @@ class TestHotel(BaseTestCase):
 
     def test_delete_hotel_not_found_negative(self):
         """Prueba Negativa 2: Eliminar un hotel que no existe."""
-        result = Hotel.delete_hotel(99)
+        with self.assertLogs("reservation_system", level="ERROR") as logs:
+            result = Hotel.delete_hotel(99)
+        self.assertIn("Hotel con ID 99", logs.output[0])
         self.assertFalse(result)
 
     def test_display_hotel_success(self):
         """Prueba mostrar la información de un hotel existente."""
         Hotel.create_hotel(1, "Hilton", "NY", 100)
-        result = Hotel.display_hotel(1)
+        with self.assertLogs("reservation_system", level="INFO"):
+            result = Hotel.display_hotel(1)
         self.assertEqual(result["name"], "Hilton")
 
     def test_display_hotel_not_found_negative(self):
@@ -82,6 +108,40 @@ class TestHotel(BaseTestCase):
         """Prueba la inicialización del objeto Hotel."""
         hotel = Hotel(1, "Hilton", "NY", 100)
         self.assertEqual(hotel.hotel_id, "1")
+        self.assertFalse(hasattr(hotel, "__dict__"))
+
+    def test_reserve_rooms_bulk(self):
+        """Prueba reservar varias habitaciones en una sola operación."""
+        Hotel.create_hotel(1, "Hilton", "NY", 2)
+        Hotel.create_hotel(2, "Marriott", "LA", 1)
+        result = Hotel.reserve_rooms([1, 2, 1, 2, 1, 99])
+        self.assertEqual(result, [True, True, True, False, False, False])
+        self.assertEqual(Hotel.display_hotel(1)["rooms"], 0)
+        self.assertEqual(Hotel.display_hotel(2)["rooms"], 0)
+
+    def test_table_aggregates_rooms(self):
+        """Prueba los recorridos agregados sobre la tabla de hoteles."""
+        Hotel.create_hotel(1, "Hilton", "NY", 10)
+        Hotel.create_hotel(2, "Marriott", "LA", 0)
+        table = Hotel.table()
+        self.assertEqual(table.total_rooms(), 10)
+        self.assertEqual(table.sold_out(), ["2"])
+        self.assertEqual(table.names[table.id2idx["1"]], "Hilton")
+        self.assertIs(Hotel.table(), table)
+        Hotel.reserve_room(1)
+        self.assertEqual(Hotel.table().total_rooms(), 9)
+
+    def test_table_with_partial_records(self):
+        """Prueba la tabla con registros incompletos o que no son objetos."""
+        save_data(Hotel.FILE_NAME, {
+            "1": {"name": "Hilton", "rooms": 1},
+            "2": {"name": "Marriott", "location": "LA", "rooms": "x"},
+            "3": None})
+        table = Hotel.table()
+        self.assertEqual(table.ids, ["1", "2"])
+        self.assertEqual(table.locations, [None, "LA"])
+        self.assertEqual(table.total_rooms(), 1)
+        self.assertEqual(table.sold_out(), ["2"])
 
     def test_cancel_room_invalid_hotel_negative(self):
         """Prueba Negativa 15: Cancelar habitación en hotel
@@ -115,6 +175,12 @@ class TestCustomer(BaseTestCase):
         result = Customer.delete_customer(99)
         self.assertFalse(result)
 
+    def test_delete_customer_null_record(self):
+        """Prueba eliminar un cliente guardado como null."""
+        save_data(Customer.FILE_NAME, {"1": None})
+        self.assertTrue(Customer.delete_customer(1))
+        self.assertEqual(load_data(Customer.FILE_NAME), {})
+
     def test_display_customer_success(self):
         """Prueba mostrar un cliente existente."""
         Customer.create_customer(1, "John Doe", "john@test.com")
@@ -180,6 +246,18 @@ class TestReservation(BaseTestCase):
         result = Reservation.create_reservation(1, 1, 1)
         self.assertFalse(result)
 
+    def test_create_reservation_from_files_on_disk(self):
+        """Prueba reservar leyendo archivos existentes que no están en
+        caché."""
+        for filename, content in (
+                (Hotel.FILE_NAME, '{"1": {"name": "Hilton", "rooms": 1}}'),
+                (Customer.FILE_NAME, '{"1": {"name": "John"}}'),
+                (Reservation.FILE_NAME, '{}')):
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write(content)
+        self.assertTrue(Reservation.create_reservation(1, 1, 1))
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["rooms"], 0)
+
     def test_cancel_reservation_success(self):
         """Prueba la cancelación de una reservación existente."""
         Hotel.create_hotel(1, "Hilton", "NY", 10)
@@ -202,20 +280,263 @@ class TestErrorHandling(BaseTestCase):
     def setUp(self):
         """Configura el entorno incluyendo archivo corrupto."""
         super().setUp()
-        with open("corrupted.json", "w", encoding="utf-8") as file:
+        self.corrupted = os.path.join(self.data_dir.name, "corrupted.json")
+        with open(self.corrupted, "w", encoding="utf-8") as file:
             file.write("{invalid_json: data")
 
-    def tearDown(self):
-        """Limpia archivos incluyendo el corrupto."""
-        super().tearDown()
-        if os.path.exists("corrupted.json"):
-            os.remove("corrupted.json")
-
     def test_load_corrupted_json_negative(self):
         """Prueba Negativa 14: Cargar un archivo JSON corrupto."""
-        result = load_data("corrupted.json")
+        with self.assertLogs("reservation_system", level="ERROR"):
+            result = load_data(self.corrupted)
         self.assertEqual(result, {})
 
+    def test_load_file_with_surrounding_whitespace(self):
+        """Prueba cargar un JSON válido rodeado de mucho espacio en
+        blanco."""
+        with open(Hotel.FILE_NAME, "w", encoding="utf-8") as file:
+            file.write(" " * 80)
+            json.dump({"1": {"name": "Hilton", "rooms": 1}}, file, indent=4)
+            file.write("\n" * 80)
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["name"], "Hilton")
+
+    def test_load_empty_file_negative(self):
+        """Prueba Negativa 16: Cargar un archivo JSON vacío."""
+        with open(Hotel.FILE_NAME, "w", encoding="utf-8"):
+            pass
+        self.assertEqual(load_data(Hotel.FILE_NAME), {})
+
+
+class TestPersistence(BaseTestCase):
+    """Casos de prueba para la carga y guardado de archivos."""
+
+    def test_load_returns_independent_copy(self):
+        """Prueba que modificar lo cargado no altera la caché."""
+        save_data(Hotel.FILE_NAME, {"1": {"name": "Hilton", "rooms": 1}})
+        data = load_data(Hotel.FILE_NAME)
+        data["1"]["rooms"] = 0
+        self.assertEqual(load_data(Hotel.FILE_NAME)["1"]["rooms"], 1)
+
+    def test_transaction_discards_saves_on_error(self):
+        """Prueba que una excepción dentro de la transacción descarta sus
+        guardados."""
+        Hotel.create_hotel(1, "Hilton", "NY", 10)
+        with self.assertRaises(RuntimeError):
+            with transaction():
+                Hotel.reserve_room(1)
+                raise RuntimeError("fallo")
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["rooms"], 10)
+
+    def test_failed_flush_keeps_pending_data(self):
+        """Prueba que un flush fallido conserva los datos y lanza el
+        error."""
+        missing = os.path.join(self.data_dir.name, "missing")
+        Hotel.FILE_NAME = os.path.join(missing, "hotels.json")
+        with transaction():
+            self.assertTrue(Hotel.create_hotel(1, "Hilton", "NY", 10))
+            with self.assertRaises(OSError):
+                flush()
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["rooms"], 10)
+        os.mkdir(missing)
+        flush()
+        self.assertTrue(os.path.exists(Hotel.FILE_NAME))
+
+    def test_background_flush_error_is_raised_on_next_save(self):
+        """Prueba que el error de una escritura en segundo plano se lanza
+        en el siguiente guardado del mismo archivo sin perder sus datos."""
+        missing = os.path.join(self.data_dir.name, "missing")
+        Hotel.FILE_NAME = os.path.join(missing, "hotels.json")
+        with transaction():
+            Hotel.create_hotel(1, "Hilton", "NY", 10)
+            with self.assertLogs("reservation_system", level="ERROR"):
+                _background_flush()
+            Customer.create_customer(1, "John", "john@test.com")
+            with self.assertRaises(OSError):
+                Hotel.create_hotel(2, "Marriott", "LA", 20)
+            self.assertEqual(sorted(load_data(Hotel.FILE_NAME)), ["1", "2"])
+            os.mkdir(missing)
+            flush()
+        self.assertEqual(len(load_data(Hotel.FILE_NAME)), 2)
+
+    def test_flush_writes_other_files_after_failure(self):
+        """Prueba que un archivo que falla no impide escribir los demás."""
+        missing = os.path.join(self.data_dir.name, "missing")
+        Hotel.FILE_NAME = os.path.join(missing, "hotels.json")
+        with transaction():
+            Hotel.create_hotel(1, "Hilton", "NY", 10)
+            Customer.create_customer(1, "John", "john@test.com")
+            with self.assertRaises(OSError):
+                flush()
+            self.assertTrue(os.path.exists(Customer.FILE_NAME))
+            os.mkdir(missing)
+            flush()
+
+    def test_save_unserializable_data_negative(self):
+        """Prueba Negativa 18: Guardar datos no serializables lanza el
+        error al llamador."""
+        with self.assertRaises(TypeError):
+            save_data(Hotel.FILE_NAME, {"1": {"name": object()}})
+        self.assertEqual(load_data(Hotel.FILE_NAME), {})
+
+    def test_save_converts_keys_like_json(self):
+        """Prueba que las llaves int se guardan como str."""
+        save_data(Hotel.FILE_NAME, {1: {"rooms": 1}})
+        self.assertEqual(load_data(Hotel.FILE_NAME), {"1": {"rooms": 1}})
+
+    def test_dumps_matches_json_module(self):
+        """Prueba que la serialización no depende de tener orjson."""
+        data = {1: {"rooms": 10 ** 20, "rate": float("nan")}}
+        expected = b'{"1":{"rooms":100000000000000000000,"rate":NaN}}'
+        self.assertEqual(_dumps(data), expected)
+        with mock.patch("reservation_system.HAVE_ORJSON", False):
+            self.assertEqual(_dumps(data), expected)
+        self.assertEqual(_dumps({1: {"rooms": 1}}), b'{"1":{"rooms":1}}')
+        self.assertTrue(math.isnan(_loads(expected)["1"]["rate"]))
+
+    def test_load_keeps_non_object_values(self):
+        """Prueba cargar y guardar un JSON cuyos valores no son objetos."""
+        save_data(Hotel.FILE_NAME, {"a": [1, 2], "1": 5})
+        flush()
+        data = load_data(Hotel.FILE_NAME)
+        self.assertEqual(data, {"a": [1, 2], "1": 5})
+        data["1"] = 6
+        save_data(Hotel.FILE_NAME, data)
+        flush()
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1"), 6)
+
+    def test_load_detects_external_change(self):
+        """Prueba que un cambio externo al archivo invalida la caché."""
+        save_data(Hotel.FILE_NAME, {"1": {"name": "Hilton", "rooms": 1}})
+        flush()
+        load_data(Hotel.FILE_NAME)
+        with open(Hotel.FILE_NAME, "w", encoding="utf-8") as file:
+            file.write('{"2": {"name": "Marriott", "rooms": 20}}')
+        self.assertEqual(list(load_data(Hotel.FILE_NAME)), ["2"])
+
+    def test_save_is_deferred_until_flush(self):
+        """Prueba que los guardados se agrupan hasta llamar a flush."""
+        with transaction():
+            Hotel.create_hotel(1, "Hilton", "NY", 10)
+            Hotel.create_hotel(2, "Marriott", "LA", 20)
+            self.assertEqual(len(load_data(Hotel.FILE_NAME)), 2)
+            self.assertFalse(os.path.exists(Hotel.FILE_NAME))
+            flush()
+        with open(Hotel.FILE_NAME, "r", encoding="utf-8") as file:
+            self.assertEqual(sorted(json.load(file)), ["1", "2"])
+
+    def test_load_key_returns_single_record(self):
+        """Prueba consultar un solo registro sin cargar todo el archivo."""
+        save_data(Hotel.FILE_NAME, {"1": {"name": "Hilton", "rooms": 1}})
+        record = load_key(Hotel.FILE_NAME, "1")
+        record["rooms"] = 0
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["rooms"], 1)
+        self.assertIsNone(load_key(Hotel.FILE_NAME, "99"))
+
+    def test_key_exists(self):
+        """Prueba la verificación de existencia de un ID."""
+        self.assertFalse(key_exists(Hotel.FILE_NAME, "1"))
+        Hotel.create_hotel(1, "Hilton", "NY", 10)
+        self.assertTrue(key_exists(Hotel.FILE_NAME, "1"))
+        self.assertFalse(key_exists(Hotel.FILE_NAME, "99"))
+
+    def test_single_change_is_appended_to_log(self):
+        """Prueba que modificar un campo sólo añade su parche al log."""
+        save_data(Hotel.FILE_NAME, {
+            str(i): {"name": f"Hotel {i}", "location": "NY", "rooms": 10}
+            for i in range(20)})
+        flush()
+        Hotel.modify_hotel(1, rooms=5)
+        flush()
+        with open(Hotel.FILE_NAME + LOG_SUFFIX, "rb") as file:
+            lines = file.read().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{"op": "replace", "path": "/1/rooms", "value": 5}])
+        compact(Hotel.FILE_NAME)
+        self.assertFalse(os.path.exists(Hotel.FILE_NAME + LOG_SUFFIX))
+        self.assertEqual(load_data(Hotel.FILE_NAME)["1"]["rooms"], 5)
+
+    def test_load_malformed_log_line_negative(self):
+        """Prueba Negativa 17: Cargar con una línea inválida en medio del
+        log."""
+        with open(Hotel.FILE_NAME, "w", encoding="utf-8") as file:
+            file.write('{"1": {"rooms": 1}}')
+        with open(Hotel.FILE_NAME + LOG_SUFFIX, "w", encoding="utf-8") as file:
+            file.write('{"op": bad}\n{"op":"remove","path":"/1"}\n')
+        with self.assertLogs("reservation_system", level="ERROR"):
+            self.assertEqual(load_data(Hotel.FILE_NAME), {})
+
+    def test_append_after_torn_log_tail(self):
+        """Prueba que un parche nuevo no se pega a una línea incompleta."""
+        save_data(Hotel.FILE_NAME, {
+            str(i): {"name": f"Hotel {i}", "location": "NY", "rooms": 10}
+            for i in range(20)})
+        flush()
+        with open(Hotel.FILE_NAME + LOG_SUFFIX, "w", encoding="utf-8") as file:
+            file.write('{"op": "replace", "path": "/1/rooms", "value": 3}\n')
+            file.write('{"op": "replace", "path": "/2/rooms", "value"')
+        Hotel.modify_hotel(1, rooms=7)
+        flush()
+        with open(Hotel.FILE_NAME + LOG_SUFFIX, "rb") as file:
+            lines = [json.loads(line) for line in file.read().splitlines()]
+        self.assertEqual(lines[-1],
+                         {"op": "replace", "path": "/1/rooms", "value": 7})
+        self.assertEqual(len(lines), 2)
+        compact(Hotel.FILE_NAME)
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["rooms"], 7)
+        self.assertEqual(load_key(Hotel.FILE_NAME, "2")["rooms"], 10)
+
+    def test_load_replays_log_over_snapshot(self):
+        """Prueba que el log se aplica sobre la instantánea al cargar."""
+        with open(Hotel.FILE_NAME, "w", encoding="utf-8") as file:
+            file.write('{"1": {"rooms": 1}, "2": {"rooms": 2}}')
+        with open(Hotel.FILE_NAME + LOG_SUFFIX, "w", encoding="utf-8") as file:
+            file.write('{"op": "replace", "path": "/1/rooms", "value": 0}\n')
+            file.write('{"op": "remove", "path": "/2"}\n')
+            file.write('{"op": "add", "path": "/3", "value": {"rooms": 3}}\n')
+            file.write('{"op": "add", "path": "/4", "value"')
+        self.assertEqual(load_data(Hotel.FILE_NAME),
+                         {"1": {"rooms": 0}, "3": {"rooms": 3}})
+
+    def test_flush_waits_for_transaction(self):
+        """Prueba que un flush de otro hilo no se intercala en una
+        transacción."""
+        flusher = threading.Thread(target=flush)
+        with transaction():
+            Hotel.create_hotel(1, "Hilton", "NY", 10)
+            flusher.start()
+            flusher.join(0.05)
+            self.assertTrue(flusher.is_alive())
+            self.assertFalse(os.path.exists(Hotel.FILE_NAME))
+        flusher.join()
+        self.assertTrue(os.path.exists(Hotel.FILE_NAME))
+
+
+@mock.patch("reservation_system.HAVE_ORJSON", False)
+class TestJsonFallback(BaseTestCase):
+    """Casos de prueba para la serialización con el módulo json."""
+
+    def test_dumps_is_compact_utf8(self):
+        """Prueba la salida compacta y sin escapes de caracteres."""
+        data = {"1": {"name": "Café", "rooms": 1}}
+        self.assertEqual(_dumps(data),
+                         '{"1":{"name":"Café","rooms":1}}'.encode("utf-8"))
+        self.assertIn(b"\n    ", _dumps(data, pretty=True))
+
+    def test_loads_memoryview(self):
+        """Prueba parsear desde un memoryview."""
+        raw = '{"1":{"name":"Café"}}'.encode("utf-8")
+        self.assertEqual(_loads(memoryview(raw)), {"1": {"name": "Café"}})
+
+    def test_round_trip_non_ascii(self):
+        """Prueba guardar y volver a leer nombres no ASCII."""
+        Hotel.create_hotel(1, "Niño Café", "Mérida", 10)
+        flush()
+        with open(Hotel.FILE_NAME, "rb") as file:
+            self.assertIn("Mérida".encode("utf-8"), file.read())
+        with open(Hotel.FILE_NAME, "ab") as file:
+            file.write(b"\n")
+        self.assertEqual(load_key(Hotel.FILE_NAME, "1")["name"], "Niño Café")
+
 
 if __name__ == "__main__":
     unittest.main()